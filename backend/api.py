@@ -0,0 +1,154 @@
+import os
+import asyncio
+import hashlib
+import logging
+from typing import Optional
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from PIL import Image
+
+from .config import Config
+from .embeddings import EmbeddingService
+from .vector_store import VectorStoreManager
+from .search import SearchService
+
+
+class RequestCoalescer:
+    """Share one in-flight computation between identical concurrent requests."""
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def run(self, key, func):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one client disconnecting does not cancel the others' result
+        return await asyncio.shield(future)
+
+
+class SearchRunner:
+    """Warm search models plus the worker pool that runs blocking search calls."""
+
+    def __init__(self, workers: int = Config.SEARCH_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self.coalescer = RequestCoalescer()
+        self.search_service = None
+        self.load_error = None
+
+    @property
+    def ready(self):
+        return self.search_service is not None
+
+    def load(self):
+        try:
+            embedding_service = EmbeddingService()
+            vector_store_manager = VectorStoreManager(embedding_service)
+            self.search_service = SearchService(embedding_service, vector_store_manager)
+        except Exception as e:
+            self.load_error = str(e)
+            raise
+
+    async def decode_image(self, image_bytes: bytes):
+        """Decode and downscale an upload on the worker pool; raises OSError if it is not an image"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.search_service.embedding_service.load_image,
+            image_bytes, Config.QUERY_IMAGE_MAX_SIZE
+        )
+
+    async def search(self, text_query: Optional[str], image_bytes: Optional[bytes], image=None):
+        image_digest = hashlib.sha256(image_bytes).hexdigest() if image_bytes else None
+        key = (text_query, image_digest)
+        loop = asyncio.get_running_loop()
+        return await self.coalescer.run(
+            key, lambda: loop.run_in_executor(self.executor, self._search, text_query, image)
+        )
+
+    def _search(self, text_query, image):
+        return self.search_service.search_database(text_query=text_query, image=image)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+runner = SearchRunner()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models once in the background; /ready reports when searches can be served
+    load_future = asyncio.get_running_loop().run_in_executor(runner.executor, runner.load)
+    load_future.add_done_callback(_log_load_failure)
+    yield
+    load_future.cancel()
+    runner.shutdown()
+
+
+def _log_load_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logging.error("Failed to load search models", exc_info=future.exception())
+
+
+async def _read_upload(upload: UploadFile, max_bytes: int):
+    # Read in chunks so oversized uploads are rejected without buffering them whole
+    chunks, size = [], 0
+    while chunk := await upload.read(1024 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Image exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+app = FastAPI(title="Renesas Design Search", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    if runner.load_error:
+        return JSONResponse(status_code=503, content={"status": "failed", "detail": runner.load_error})
+    if not runner.ready:
+        return JSONResponse(status_code=503, content={"status": "loading"})
+    return {"status": "ready"}
+
+
+@app.post("/search")
+async def search(text_query: Optional[str] = Form(None), image: Optional[UploadFile] = File(None)):
+    if not runner.ready:
+        raise HTTPException(status_code=503, detail="Search models are still loading")
+
+    text_query = text_query.strip() if text_query else None
+    image_bytes = await _read_upload(image, Config.SEARCH_MAX_UPLOAD_BYTES) if image else None
+    if not text_query and not image_bytes:
+        raise HTTPException(status_code=400, detail="Provide a text_query, an image, or both")
+
+    # Validate the upload before any embedding or index work is spent on the request
+    decoded_image = None
+    if image_bytes:
+        try:
+            decoded_image = await runner.decode_image(image_bytes)
+        except (OSError, Image.DecompressionBombError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid image upload: {e}")
+
+    results = await runner.search(text_query, image_bytes, decoded_image)
+    return {"results": results}
+
+
+def main():
+    import uvicorn
+    uvicorn.run(app, host=os.getenv("SEARCH_API_HOST", "0.0.0.0"), port=int(os.getenv("SEARCH_API_PORT", "8000")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import json
+import argparse
+import pandas as pd
+
+from .embeddings import EmbeddingService
+from .vector_store import VectorStoreManager
+from .search import SearchService
+
+
+def load_queries(input_path, column=None):
+    """Read line items from a CSV (one query per row) or a plain text file (one per line)"""
+    if input_path.lower().endswith(".csv"):
+        df = pd.read_csv(input_path)
+        column = column or df.columns[0]
+        queries = df[column].fillna("").astype(str).tolist()
+    else:
+        with open(input_path, encoding="utf-8") as f:
+            queries = [line.rstrip("\n") for line in f]
+
+    return [(line_no, query.strip()) for line_no, query in enumerate(queries, start=1) if query.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the catalog for every line item of a bill of materials.")
+    parser.add_argument("input", help="CSV or text file with one query per row/line")
+    parser.add_argument("--column", help="CSV column holding the query text (default: first column)")
+    parser.add_argument("--output", help="JSONL output path (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Queries embedded per API call")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel index queries")
+    args = parser.parse_args(argv)
+
+    items = load_queries(args.input, args.column)
+    line_numbers = [line_no for line_no, _ in items]
+    queries = [query for _, query in items]
+
+    embedding_service = EmbeddingService()
+    vector_store_manager = VectorStoreManager(embedding_service)
+    search_service = SearchService(embedding_service, vector_store_manager)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        results = search_service.search_batch(queries, batch_size=args.batch_size, max_workers=args.workers)
+        for line_no, (query, matches, error) in zip(line_numbers, results):
+            if error:
+                record = {"line": line_no, "query": query, "error": error}
+            else:
+                record = {"line": line_no, "query": query, "results": matches}
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,4 +22,15 @@ class Config:
     
     # Embedding Configurations
     TEXT_EMBED_MODEL = "text-embedding-3-small"
-    IMAGE_EMBED_MODEL = "openai/clip-vit-base-patch32"
\ No newline at end of file
+    IMAGE_EMBED_MODEL = "openai/clip-vit-base-patch32"
+    # Uploaded query images are downscaled to this many pixels per side before CLIP and captioning
+    QUERY_IMAGE_MAX_SIZE = 1024
+    # Diagrams share one image vector when their 256-bit perceptual hashes differ by at most
+    # this many bits and their thumbnails differ by at most this mean grayscale level (0-255)
+    IMAGE_DEDUP_MAX_DISTANCE = 20
+    IMAGE_DEDUP_MAX_PIXEL_DIFF = 3.0
+
+    # Search Service
+    SEARCH_API_URL = os.getenv("SEARCH_API_URL")
+    SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))
+    SEARCH_MAX_UPLOAD_BYTES = int(os.getenv("SEARCH_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
@@ -1,18 +1,14 @@
 import os
 import time
-import random
 import json
 import pandas as pd
 from datetime import datetime
 import logging
 from tqdm import tqdm
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import re
 
+from .fetcher import PageFetcher
+
 # Simplified folder structure
 BASE_DIR = "Renesas_Scraper"
 for folder in ["images", "data", "logs"]:
@@ -43,29 +39,23 @@ def sanitize_filename(filename):
     logging.debug(f"Sanitized filename: {result}")
     return result
 
-def get_soup(url):
-    """Simplified soup object getter"""
+# Shared across the crawl so connections, validators and per-host pacing are reused
+fetcher = PageFetcher(cache_path=os.path.join(BASE_DIR, "data", "fetch_cache.json"), min_delay=1.0)
+
+def get_soup(url, required_selectors=(), conditional_selectors=()):
+    """Fetch over HTTP, falling back to the browser if required_selectors are missing"""
     logging.info(f"Fetching page: {url}")
-    try:
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.get(url)
-        wait_time = random.uniform(2, 4)
-        logging.debug(f"Waiting {wait_time:.2f} seconds")
-        time.sleep(wait_time)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        driver.quit()
-        logging.info(f"Successfully fetched page: {url}")
-        return soup
-    except Exception as e:
-        logging.error(f"Error fetching URL {url}: {str(e)}")
-        if 'driver' in locals():
-            driver.quit()
+    soup = fetcher.get_soup(url, required_selectors, conditional_selectors)
+    if soup is None:
+        logging.error(f"Error fetching URL {url}")
         return None
+    logging.info(f"Successfully fetched page: {url}")
+    return soup
 
 def get_winning_applications():
     """Get main applications"""
     logging.info("Starting to fetch main applications")
-    soup = get_soup("https://www.renesas.com/en/applications")
+    soup = get_soup("https://www.renesas.com/en/applications", [".rcard__title"])
     if not soup:
         logging.error("Failed to get main applications page")
         return {}
@@ -85,7 +75,7 @@ def get_winning_applications():
 def get_sub_application_categories(url):
     """Get sub-categories"""
     logging.info(f"Fetching sub-applications from: {url}")
-    soup = get_soup(url)
+    soup = get_soup(url, [".rcard__title"])
     if not soup:
         logging.error(f"Failed to get sub-applications from: {url}")
         return {}
@@ -105,7 +95,7 @@ def get_sub_application_categories(url):
 def extract_categories(url):
     """Extract category and subcategory data"""
     logging.info(f"Extracting categories from: {url}")
-    soup = get_soup(url)
+    soup = get_soup(url, ["div.application-category-list__group"])
     if not soup:
         logging.error(f"Failed to get categories from: {url}")
         return {}
@@ -134,7 +124,12 @@ def extract_categories(url):
 def extract_data(url, app_name, sub_app_name, category_name, subcat_name):
     """Extract final level data"""
     logging.info(f"Extracting data for {subcat_name} under {app_name}/{sub_app_name}/{category_name}")
-    soup = get_soup(url)
+    soup = get_soup(
+        url,
+        ["section#tab-description"],
+        # The diagram is optional, but a placeholder without its SVG means it is drawn by script
+        [("div.diagram-section-media", "div.diagram-section-media svg")]
+    )
     if not soup:
         logging.error(f"Failed to get data from: {url}")
         return None
@@ -220,10 +215,6 @@ def main():
                             all_data.append(data)
                             app_data.append(data)
                             logging.debug("Data successfully extracted and added")
-                        
-                        wait_time = random.uniform(1, 3)
-                        logging.debug(f"Waiting {wait_time:.2f} seconds before next request")
-                        time.sleep(wait_time)
             
             logging.info(f"Saving {len(app_data)} records to CSV")
             csv_path = os.path.join(BASE_DIR, "data", f"{app_name}.csv")
@@ -246,9 +237,12 @@ def main():
         end_time = time.time()
         duration = end_time - start_time
         logging.info(f"Scraping completed in {duration:.2f} seconds")
+        logging.info(f"Fetch stats: {fetcher.stats}")
         
     except Exception as e:
         logging.error(f"Critical error during scraping: {str(e)}", exc_info=True)
+    finally:
+        fetcher.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import base64
+from io import BytesIO
 from typing import List
 from PIL import Image
 from openai import OpenAI
@@ -19,17 +20,41 @@ class EmbeddingService:
             input=text
         )
         return response.data[0].embedding
+
+    def get_text_embeddings(self, texts: List[str], batch_size: int = 100):
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            response = self.openai_client.embeddings.create(
+                model=Config.TEXT_EMBED_MODEL,
+                input=texts[start:start + batch_size]
+            )
+            # The API does not guarantee response order, so sort by input index
+            embeddings.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+        return embeddings
     
-    def get_image_embedding(self, image_path):
-        image = Image.open(image_path)
+    def load_image(self, image, max_size: int = None):
+        """Decode a file path, raw bytes or PIL image once, optionally capped to max_size pixels per side"""
+        if isinstance(image, (bytes, bytearray)):
+            image = Image.open(BytesIO(image))
+        elif not isinstance(image, Image.Image):
+            image = Image.open(image)
+        if max_size:
+            image = image.copy()
+            image.thumbnail((max_size, max_size))
+        return image if image.mode == "RGB" else image.convert("RGB")
+
+    def get_image_embedding(self, image):
+        image = self.load_image(image)
         inputs = self.clip_processor(images=image, return_tensors="pt")
         image_features = self.clip_model.get_image_features(**inputs)
         return image_features.detach().numpy().flatten().tolist()
     
-    def generate_image_caption(self, image_path):
+    def generate_image_caption(self, image):
         try:
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode("utf-8")
+            buffer = BytesIO()
+            # JPEG keeps the payload close to the upload's size; PNG would inflate photos
+            self.load_image(image).save(buffer, format="JPEG", quality=90)
+            base64_image = base64.b64encode(buffer.getvalue()).decode("utf-8")
             
             response = self.openai_client.chat.completions.create(
                 model="gpt-4o-mini",
@@ -39,7 +64,7 @@ class EmbeddingService:
                         "Provide a concise, technical description of the system's key components and functionality."},
                     {"role": "user", "content": [
                         {"type": "text", "text": "Describe this technical system or block diagram."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{base64_image}"}}
+                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
                     ]}
                 ],
                 max_tokens=150
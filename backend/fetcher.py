@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+
+class AdaptiveRateLimiter:
+    """Per-host request pacing driven by observed latency and error rate.
+
+    The delay between requests is a multiple of the host's smoothed latency,
+    scaled up by the share of errors (exceptions, 429 and 5xx) among its most
+    recent requests, and eases back down gradually as the error rate falls.
+    A ``Retry-After`` from the server is always honoured, even beyond
+    ``max_delay``.
+    """
+
+    def __init__(self, min_delay=1.0, max_delay=30.0, latency_factor=1.0,
+                 error_penalty=10.0, error_window=20, recovery_factor=0.8, smoothing=0.3):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latency_factor = latency_factor
+        self.error_penalty = error_penalty
+        self.error_window = error_window
+        self.recovery_factor = recovery_factor
+        self.smoothing = smoothing
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = {
+                "delay": self.min_delay,
+                "latency": None,
+                "next_allowed": 0.0,
+                "outcomes": deque(maxlen=self.error_window),
+            }
+        return self._hosts[host]
+
+    def get_delay(self, host):
+        with self._lock:
+            return self._state(host)["delay"]
+
+    def get_error_rate(self, host):
+        with self._lock:
+            return _error_rate(self._state(host)["outcomes"])
+
+    def wait(self, host):
+        """Block until the next request to ``host`` is allowed."""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            start = max(now, state["next_allowed"])
+            # Reserve the slot before sleeping so concurrent callers queue up
+            state["next_allowed"] = start + state["delay"]
+        wait_time = start - now
+        if wait_time > 0:
+            logging.debug(f"Rate limiting {host}: waiting {wait_time:.2f} seconds")
+            time.sleep(wait_time)
+
+    def record(self, host, latency, error=False, retry_after=None):
+        """Update the pacing for ``host`` from the outcome of one request."""
+        with self._lock:
+            state = self._state(host)
+            state["outcomes"].append(bool(error))
+            if not error:
+                if state["latency"] is None:
+                    state["latency"] = latency
+                else:
+                    state["latency"] = (self.smoothing * latency
+                                        + (1 - self.smoothing) * state["latency"])
+
+            base = self.min_delay
+            if state["latency"] is not None:
+                base = max(base, state["latency"] * self.latency_factor)
+            target = base * (1 + self.error_penalty * _error_rate(state["outcomes"]))
+            # Back off immediately, but recover gradually instead of jumping straight down
+            if target < state["delay"]:
+                target = max(target, state["delay"] * self.recovery_factor)
+            state["delay"] = min(self.max_delay, max(self.min_delay, target))
+
+            wait_time = state["delay"]
+            if retry_after is not None:
+                wait_time = max(wait_time, retry_after)
+            state["next_allowed"] = time.monotonic() + wait_time
+
+
+def _error_rate(outcomes):
+    return sum(outcomes) / len(outcomes) if outcomes else 0.0
+
+
+class PageFetcher:
+    """Fetch pages over pooled keep-alive HTTP, rendering in Chrome only when needed.
+
+    Responses are cached per URL together with their ``ETag`` and
+    ``Last-Modified`` validators, persisted to ``cache_path`` between runs, so
+    repeat crawls are sent as conditional requests. If a successful response
+    lacks any of the ``required_selectors`` the page is assumed to be
+    client-rendered and is loaded in a headless browser. Failed requests are
+    retried over HTTP only, so a struggling host never gets a browser load.
+    """
+
+    def __init__(self, rate_limiter=None, timeout=30, pool_size=10,
+                 use_browser=True, user_agent=None, cache_path=None,
+                 min_delay=1.0, retries=2, render_timeout=10):
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(min_delay=min_delay)
+        self.timeout = timeout
+        self.use_browser = use_browser
+        self.cache_path = cache_path
+        self.retries = retries
+        self.render_timeout = render_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = user_agent or (
+            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+        )
+        self.cache = self._load_cache()
+        self.stats = {"http": 0, "not_modified": 0, "browser": 0, "errors": 0}
+        self._driver = None
+
+    def fetch_html(self, url):
+        """Return the server HTML for ``url``, revalidating any cached copy."""
+        host = urlparse(url).netloc
+        headers = {}
+        cached = self.cache.get(url)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        self.rate_limiter.wait(host)
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            self.rate_limiter.record(host, time.monotonic() - start, error=True)
+            self.stats["errors"] += 1
+            raise
+        latency = time.monotonic() - start
+
+        if response.status_code == 429 or response.status_code >= 500:
+            self.rate_limiter.record(host, latency, error=True,
+                                     retry_after=_parse_retry_after(response))
+            self.stats["errors"] += 1
+            response.raise_for_status()
+        self.rate_limiter.record(host, latency)
+
+        if response.status_code == 304 and cached:
+            logging.debug(f"Not modified: {url}")
+            self.stats["not_modified"] += 1
+            return cached["html"]
+
+        response.raise_for_status()
+        self.stats["http"] += 1
+        self.cache[url] = {
+            "html": response.text,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return response.text
+
+    def get_soup(self, url, required_selectors=(), conditional_selectors=()):
+        """Return a BeautifulSoup for ``url``, or None if it could not be fetched.
+
+        ``conditional_selectors`` are ``(container, content)`` pairs: when the
+        server HTML has ``container`` but not ``content`` (e.g. a diagram
+        placeholder whose SVG is drawn by script), the page is rendered too.
+        """
+        html = None
+        for attempt in range(self.retries + 1):
+            try:
+                html = self.fetch_html(url)
+                break
+            except requests.RequestException as e:
+                logging.warning(f"HTTP fetch failed for {url}: {str(e)}")
+                # Retry over HTTP after the limiter's backoff; never escalate to the browser
+                if not _is_retryable(e) or attempt == self.retries:
+                    return None
+
+        soup = BeautifulSoup(html, "html.parser")
+        wait_for = list(required_selectors) + [
+            content for container, content in conditional_selectors if soup.select_one(container)
+        ]
+        missing = [sel for sel in wait_for if not soup.select_one(sel)]
+        if not missing or not self.use_browser:
+            return soup
+
+        logging.info(f"Content {missing} missing from server HTML, rendering: {url}")
+        return self.render(url, wait_for)
+
+    def render(self, url, required_selectors=()):
+        """Load ``url`` in a reused headless Chrome instance and wait for ``required_selectors``.
+
+        If they never appear the page is returned as rendered, leaving optional
+        sections for the caller to handle; None means the browser itself failed.
+        """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        host = urlparse(url).netloc
+        self.rate_limiter.wait(host)
+        start = time.monotonic()
+        try:
+            driver = self._get_driver()
+            driver.get(url)
+            try:
+                WebDriverWait(driver, self.render_timeout).until(
+                    lambda d: all(d.find_elements(By.CSS_SELECTOR, sel) for sel in required_selectors)
+                )
+            except TimeoutException:
+                logging.warning(f"Content {list(required_selectors)} never appeared on {url}, using rendered page")
+            html = driver.page_source
+        except Exception as e:
+            self.rate_limiter.record(host, time.monotonic() - start, error=True)
+            self.stats["errors"] += 1
+            logging.error(f"Error rendering URL {url}: {str(e)}")
+            self._quit_driver()
+            return None
+        self.rate_limiter.record(host, time.monotonic() - start)
+        self.stats["browser"] += 1
+        return BeautifulSoup(html, "html.parser")
+
+    def _get_driver(self):
+        if self._driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+            from selenium.webdriver.chrome.options import Options
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            chrome_options = Options()
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            service = Service(ChromeDriverManager().install())
+            self._driver = webdriver.Chrome(service=service, options=chrome_options)
+        return self._driver
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable fetch cache {self.cache_path}: {str(e)}")
+            return {}
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        # Only pages with validators can be revalidated, so skip the rest
+        entries = {url: entry for url, entry in self.cache.items()
+                   if entry.get("etag") or entry.get("last_modified")}
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _quit_driver(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+    def close(self):
+        self._quit_driver()
+        self.save_cache()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _is_retryable(error):
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status == 429 or (status is not None and status >= 500)
+    # Connection errors and timeouts
+    return True
+
+
+def _parse_retry_after(response):
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,68 @@
+from typing import Dict, List
+from PIL import Image, ImageChops, ImageStat
+
+
+def _load_grayscale(image_path):
+    image = Image.open(image_path)
+    if image.mode in ("RGBA", "LA", "P"):
+        # Converted SVGs have transparent backgrounds; flatten onto white before comparing
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image)
+    return image.convert("L")
+
+
+def difference_hash(image, hash_size=16):
+    """Perceptual (difference) hash of hash_size * hash_size bits, robust to small rendering changes"""
+    if not isinstance(image, Image.Image):
+        image = _load_grayscale(image)
+    image = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+
+    pixels = list(image.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | int(left > right)
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def pixel_difference(a, b):
+    """Mean absolute grayscale difference (0-255) between two equally sized thumbnails"""
+    return ImageStat.Stat(ImageChops.difference(a, b)).mean[0]
+
+
+def cluster_images(image_paths: Dict, max_distance=20, max_pixel_diff=3.0, thumb_size=128) -> List[List]:
+    """Group keys whose images are near-identical to a cluster's first image.
+
+    A candidate must be within max_distance hash bits of the representative and
+    its thumbnail must differ by at most max_pixel_diff on average, so diagrams
+    that merely share a layout are not merged. Returns clusters in input order;
+    the first key of each cluster is its representative.
+    """
+    clusters = []
+    for key, path in image_paths.items():
+        try:
+            image = _load_grayscale(path)
+            image_hash = difference_hash(image)
+            thumb = image.resize((thumb_size, thumb_size), Image.LANCZOS)
+        except Exception as e:
+            print(f"Error hashing {path}: {e}")
+            clusters.append((None, None, [key]))
+            continue
+
+        for cluster_hash, cluster_thumb, members in clusters:
+            if (cluster_hash is not None
+                    and hamming_distance(image_hash, cluster_hash) <= max_distance
+                    and pixel_difference(thumb, cluster_thumb) <= max_pixel_diff):
+                members.append(key)
+                break
+        else:
+            clusters.append((image_hash, thumb, [key]))
+
+    return [members for _, _, members in clusters]
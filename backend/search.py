@@ -1,60 +1,117 @@
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
 from .config import Config
 from .embeddings import EmbeddingService
 from .vector_store import VectorStoreManager
 
 
 class SearchService:
+    text_weight = 0.6
+    image_weight = 0.4
+
     def __init__(self, embedding_service : EmbeddingService, vector_store_manager: VectorStoreManager):
         self.embedding_service = embedding_service
         self.text_index = vector_store_manager.text_index
         self.image_index = vector_store_manager.image_index
 
 
-    def search_database(self, text_query:str = None, image_path: str = None):
+    def search_database(self, text_query:str = None, image_path: str = None, image=None):
+        """Search by text and/or image; image may be raw bytes or a PIL image, image_path a file"""
         results = []
-        text_weight = 0.6
-        image_weight = 0.4 
+        if image is None:
+            image = image_path or None
 
         if text_query:
             text_embedding = self.embedding_service.get_text_embedding(text_query)
-            text_results = self.text_index.query(
-                vector=text_embedding, top_k=5, include_metadata=True
-            )["matches"]
-
-            for res in text_results:
-                res["score"] *= text_weight
+            results.extend(self._query_text(text_embedding))
 
-            results.extend(text_results)
+        if image is not None:
+            # Decode and downscale once, then share with captioning and CLIP
+            image = self.embedding_service.load_image(image, max_size=Config.QUERY_IMAGE_MAX_SIZE)
 
-        if image_path:
             # Generate image caption
-            caption = self.embedding_service.generate_image_caption(image_path)
+            caption = self.embedding_service.generate_image_caption(image)
             print(f"Generated Caption: {caption}")
 
             # Image embedding
-            image_embedding = self.embedding_service.get_image_embedding(image_path)
+            image_embedding = self.embedding_service.get_image_embedding(image)
             image_results = self.image_index.query(
                 vector=image_embedding, top_k=5, include_metadata=True
             )["matches"]
 
             for res in image_results:
-                res["score"] *= image_weight
+                res["score"] *= self.image_weight
 
-            results.extend(image_results)
+            results.extend(self._expand_image_clusters(image_results))
 
             # Caption-based text search
             if caption:
                 text_caption_embedding = self.embedding_service.get_text_embedding(caption)
-                text_caption_results = self.text_index.query(
-                    vector=text_caption_embedding, top_k=5, include_metadata=True
-                )["matches"]
-
-                for res in text_caption_results:
-                    res["score"] *= text_weight
-
-                results.extend(text_caption_results)
-
+                results.extend(self._query_text(text_caption_embedding))
+
+        return self._unique_results(results)
+
+    def search_batch(self, text_queries: List[str], batch_size: int = 100, max_workers: int = 8):
+        """Search many text queries, yielding (query, results, error) triples in input order.
+
+        Queries are embedded batch_size at a time and each batch is sent to
+        the index as parallel queries, so results stream out batch by batch.
+        A failed embedding or index call yields an error message for the
+        affected queries instead of stopping the whole run.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for start in range(0, len(text_queries), batch_size):
+                batch = text_queries[start:start + batch_size]
+                try:
+                    embeddings = self.embedding_service.get_text_embeddings(batch, batch_size=batch_size)
+                except Exception as e:
+                    for query in batch:
+                        yield query, [], f"Embedding failed: {e}"
+                    continue
+                for query, (matches, error) in zip(batch, pool.map(self._safe_query_text, embeddings)):
+                    yield query, self._unique_results(matches), error
+
+    def _safe_query_text(self, embedding):
+        try:
+            return self._query_text(embedding), None
+        except Exception as e:
+            return [], f"Index query failed: {e}"
+
+    def _query_text(self, embedding):
+        text_results = self.text_index.query(
+            vector=embedding, top_k=5, include_metadata=True
+        )["matches"]
+
+        for res in text_results:
+            res["score"] *= self.text_weight
+
+        return text_results
+
+    def _expand_image_clusters(self, image_results):
+        """Map each diagram-cluster hit back to one result per member product"""
+        member_ids = []
+        for res in image_results:
+            for member_id in res["metadata"].get("member_ids") or []:
+                if member_id not in member_ids:
+                    member_ids.append(member_id)
+        if not member_ids:
+            return image_results
+
+        members = self.text_index.fetch(ids=member_ids).vectors
+
+        expanded = []
+        for res in image_results:
+            ids = res["metadata"].get("member_ids")
+            if not ids:
+                # Vectors indexed before clustering carry their own product metadata
+                expanded.append(res)
+                continue
+            for member_id in ids:
+                if member_id in members:
+                    expanded.append({"metadata": members[member_id].metadata, "score": res["score"]})
+        return expanded
+
+    def _unique_results(self, results, limit: int = 5) -> List[Dict]:
         unique_results = []
         seen_products = set()
         for result in sorted(results, key=lambda x: x["score"], reverse=True):
@@ -77,5 +134,5 @@ class SearchService:
                 })
                 seen_products.add(product)
 
-        return unique_results[:5]
+        return unique_results[:limit]
 
@@ -1,10 +1,12 @@
 import os
 import json
+import hashlib
 import pandas as pd
 from pinecone import Pinecone, ServerlessSpec
 
 from .config import Config
 from .embeddings import EmbeddingService
+from .image_dedup import cluster_images
 
 class VectorStoreManager:
     def __init__(self, embedding_service: EmbeddingService):
@@ -52,6 +54,24 @@ class VectorStoreManager:
             lambda x: os.path.splitext(x)[0] + ".png" if pd.notna(x) else None
         )
 
+        # Stable per-product IDs so indexing several CSVs never collides on row positions
+        df["vector_key"] = df.apply(self._vector_key, axis=1)
+
+        # Collapse near-duplicate diagrams so each cluster is embedded and stored once
+        image_paths = {}
+        for idx, row in df.iterrows():
+            if row['image']:
+                image_path = os.path.join(Config.IMAGES_DIR, row['image'])
+                if os.path.exists(image_path):
+                    image_paths[idx] = image_path
+        image_clusters = {
+            members[0]: members
+            for members in cluster_images(
+                image_paths, Config.IMAGE_DEDUP_MAX_DISTANCE, Config.IMAGE_DEDUP_MAX_PIXEL_DIFF
+            )
+        }
+        print(f"Collapsed {len(image_paths)} diagrams into {len(image_clusters)} image vectors")
+
         text_vectors, image_vectors = [], []
 
         for idx, row in df.iterrows():
@@ -71,21 +91,25 @@ class VectorStoreManager:
 
             # Text vector
             text_vectors.append({
-                'id': f"text_{idx}",
+                'id': f"text_{row['vector_key']}",
                 'values': text_embedding,
                 'metadata': {**metadata, 'type': 'text'}
             })
 
-            # Image embedding (if image exists)
-            if row['image']:
-                image_path = os.path.join(Config.IMAGES_DIR, row['image'])
-                if os.path.exists(image_path):
-                    image_embedding = self.embedding_service.get_image_embedding(image_path)
-                    image_vectors.append({
-                        'id': f"image_{idx}",
-                        'values': image_embedding,
-                        'metadata': {**metadata, 'type': 'image'}
-                    })
+            # Image embedding (once per diagram cluster), listing every member product
+            if idx in image_clusters:
+                members = image_clusters[idx]
+                image_embedding = self.embedding_service.get_image_embedding(image_paths[idx])
+                image_vectors.append({
+                    'id': f"image_{row['vector_key']}",
+                    'values': image_embedding,
+                    'metadata': {
+                        **metadata,
+                        'type': 'image',
+                        'member_ids': [f"text_{df.at[member, 'vector_key']}" for member in members],
+                        'member_products': [str(df.at[member, 'product']) for member in members]
+                    }
+                })
 
             # Batch upsert
             if len(text_vectors) >= 100:
@@ -100,4 +124,10 @@ class VectorStoreManager:
         if text_vectors:
             self.text_index.upsert(vectors=text_vectors)
         if image_vectors:
-            self.image_index.upsert(vectors=image_vectors)
\ No newline at end of file
+            self.image_index.upsert(vectors=image_vectors)
+
+    @staticmethod
+    def _vector_key(row):
+        name = "|".join(str(row[col]) for col in
+                        ["application_category", "sub_category", "sub_product_categories", "product"])
+        return hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
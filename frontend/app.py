@@ -3,15 +3,13 @@ import streamlit as st
 import sys
 from PIL import Image
 import base64
+import requests
 from io import BytesIO
 from openai import OpenAI
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.config import Config
-from backend.embeddings import EmbeddingService
-from backend.vector_store import VectorStoreManager
-from backend.search import SearchService
 
 # [Previous helper functions remain the same]
 def summarize_result(openai_client, result):
@@ -36,13 +34,30 @@ def summarize_result(openai_client, result):
     
     return response.choices[0].message.content.strip()
 
-def perform_search(search_service, text_query, image_path):
+def perform_search(search_service, text_query, image_bytes):
+    if search_service is None:
+        return remote_search(text_query, image_bytes)[:3]
+
     results = search_service.search_database(
         text_query=text_query,
-        image_path=image_path
+        image=image_bytes
     )
     return results[:3]
 
+def remote_search(text_query, image_bytes):
+    # Delegate to the standalone search service (backend/api.py)
+    files = {}
+    if image_bytes:
+        files["image"] = ("query_image", image_bytes, "application/octet-stream")
+    response = requests.post(
+        f"{Config.SEARCH_API_URL.rstrip('/')}/search",
+        data={"text_query": text_query or ""},
+        files=files or None,
+        timeout=120
+    )
+    response.raise_for_status()
+    return response.json()["results"]
+
 def display_search_results(results, openai_client):
     if not results:
         st.warning("No results found.")
@@ -164,10 +179,17 @@ def main():
     st.set_page_config(page_title="Renesas Design Search and Chat", page_icon="🔍", layout="wide")
     st.title("Renesas Design Search and Chat")
 
-    # Initialize services
-    embedding_service = EmbeddingService()
-    vector_store_manager = VectorStoreManager(embedding_service)
-    search_service = SearchService(embedding_service, vector_store_manager)
+    # Initialize services; searches go to the search service when SEARCH_API_URL is set
+    search_service = None
+    if not Config.SEARCH_API_URL:
+        # Imported here so thin-client sessions never load torch, transformers or pinecone
+        from backend.embeddings import EmbeddingService
+        from backend.vector_store import VectorStoreManager
+        from backend.search import SearchService
+
+        embedding_service = EmbeddingService()
+        vector_store_manager = VectorStoreManager(embedding_service)
+        search_service = SearchService(embedding_service, vector_store_manager)
     openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
 
     # Initialize session state
@@ -206,25 +228,17 @@ def main():
             st.session_state.search_query = text_query
             st.session_state.search_image = image_query
             
-            image_path = None
-            if image_query:
-                temp_image_path = os.path.join(Config.BASE_DIR, "temp_image.png")
-                os.makedirs(Config.BASE_DIR, exist_ok=True)
-                with open(temp_image_path, "wb") as f:
-                    f.write(image_query.getbuffer())
-                image_path = temp_image_path
+            # Keep the upload in memory; it is decoded once inside the search
+            image_bytes = image_query.getvalue() if image_query else None
 
             try:
-                results = perform_search(search_service, text_query, image_path)
+                results = perform_search(search_service, text_query, image_bytes)
                 st.session_state.search_results = results
                 st.session_state.search_performed = True
                 display_search_results(results, openai_client)
 
             except Exception as e:
                 st.error(f"An error occurred during search: {str(e)}")
-            finally:
-                if image_path and os.path.exists(image_path):
-                    os.remove(image_path)
 
     # Display chat section after search
     if st.session_state.search_performed:
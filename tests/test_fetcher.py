@@ -0,0 +1,136 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.fetcher import AdaptiveRateLimiter, PageFetcher
+
+
+PAGE = b"<html><body><section id='tab-description'><div class='wysiwyg'>Hello</div></section></body></html>"
+EMPTY_PAGE = b"<html><body><div id='app'></div></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Per-path plan of statuses to return before serving the page normally
+    failures = {}
+    requests = []
+
+    def do_GET(self):
+        Handler.requests.append((self.path, self.headers.get("If-None-Match")))
+        pending = Handler.failures.get(self.path)
+        if pending:
+            self.send_response(pending.pop(0))
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+                return
+            self._send(PAGE, etag='"v1"')
+        elif self.path == "/empty":
+            self._send(EMPTY_PAGE)
+        else:
+            self._send(PAGE)
+
+    def _send(self, body, etag=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.failures = {}
+    Handler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_fetcher(**kwargs):
+    return PageFetcher(min_delay=0.0, **kwargs)
+
+
+def test_conditional_request_uses_persisted_cache(server, tmp_path):
+    cache_path = str(tmp_path / "fetch_cache.json")
+
+    with make_fetcher(cache_path=cache_path) as fetcher:
+        assert "Hello" in fetcher.fetch_html(f"{server}/etag")
+        assert fetcher.stats["http"] == 1
+
+    # A new run loads the validators from disk and gets a 304
+    with make_fetcher(cache_path=cache_path) as fetcher:
+        assert "Hello" in fetcher.fetch_html(f"{server}/etag")
+        assert fetcher.stats["not_modified"] == 1
+        assert fetcher.stats["http"] == 0
+
+    assert Handler.requests == [("/etag", None), ("/etag", '"v1"')]
+
+
+def test_missing_selectors_render_only_when_browser_enabled(server):
+    with make_fetcher(use_browser=False) as fetcher:
+        soup = fetcher.get_soup(f"{server}/empty", ["section#tab-description"])
+        assert soup is not None
+        assert soup.select_one("section#tab-description") is None
+
+    with make_fetcher() as fetcher:
+        rendered = []
+        fetcher.render = lambda url, selectors: rendered.append((url, selectors)) or "rendered"
+        assert fetcher.get_soup(f"{server}/page", ["section#tab-description"]).select_one("div.wysiwyg")
+        assert rendered == []
+        assert fetcher.get_soup(f"{server}/empty", ["section#tab-description"]) == "rendered"
+        assert rendered == [(f"{server}/empty", ["section#tab-description"])]
+
+
+def test_conditional_selectors_trigger_render(server):
+    with make_fetcher() as fetcher:
+        rendered = []
+        fetcher.render = lambda url, selectors: rendered.append(selectors) or "rendered"
+        # Container present without its content: render and wait for it
+        fetcher.get_soup(f"{server}/page", conditional_selectors=[("div.wysiwyg", "div.wysiwyg svg")])
+        assert rendered == [["div.wysiwyg svg"]]
+        # Container absent: nothing extra to wait for
+        fetcher.get_soup(f"{server}/page", conditional_selectors=[("div.diagram", "div.diagram svg")])
+        assert rendered == [["div.wysiwyg svg"]]
+
+
+def test_server_errors_retry_over_http_without_browser(server):
+    Handler.failures = {"/flaky": [503, 429], "/down": [503, 503, 503]}
+    with make_fetcher(retries=2) as fetcher:
+        fetcher.render = lambda *args: pytest.fail("browser used after a server error")
+
+        soup = fetcher.get_soup(f"{server}/flaky", ["section#tab-description"])
+        assert soup.select_one("section#tab-description") is not None
+        assert fetcher.get_soup(f"{server}/down") is None
+        assert fetcher.stats["errors"] == 5
+
+
+def test_rate_limiter_backs_off_with_error_rate_and_honours_retry_after():
+    limiter = AdaptiveRateLimiter(min_delay=1.0, max_delay=30.0)
+    limiter.record("host", 0.1)
+    assert limiter.get_delay("host") == 1.0
+
+    limiter.record("host", 0.1, error=True)
+    assert limiter.get_error_rate("host") == 0.5
+    assert limiter.get_delay("host") == pytest.approx(6.0)
+
+    limiter.record("host", 0.1, error=True, retry_after=120)
+    assert limiter.get_delay("host") <= 30.0
+    # The server's window is respected even though it exceeds max_delay
+    assert limiter._hosts["host"]["next_allowed"] - time.monotonic() > 100